@@ -7,15 +7,21 @@ This module provides functions for:
 - Getting current authenticated user
 """
 
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Optional
-from jose import JWTError, jwt
+import jwt
+from jwt import PyJWTError
+from jwt.algorithms import HMACAlgorithm
 import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 import os
 import hashlib
+import hmac
+import threading
+import time
+from cachetools import TTLCache
 from dotenv import load_dotenv
 
 from app.database import get_db
@@ -26,67 +32,96 @@ load_dotenv()
 # JWT Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
+_SECRET_KEY_BYTES = SECRET_KEY.encode('utf-8')  # Encoded once, reused for every token
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+ACCESS_TOKEN_EXPIRE = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)  # Built once, not per token
+_ACCESS_TOKEN_EXPIRE_SECONDS = ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+
+class _KeyedHMACAlgorithm(HMACAlgorithm):
+    """
+    HMAC JWT algorithm that derives the key schedule only once.
+    
+    The HMAC state primed with our secret key (inner/outer pads) is built at
+    import time; each sign/verify copies it instead of re-deriving the pads.
+    Other keys fall back to the regular PyJWT implementation.
+    """
+    
+    def __init__(self, hash_alg, key: bytes):
+        super().__init__(hash_alg)
+        self._key = key
+        self._keyed_hmac = hmac.new(key, digestmod=hash_alg)
+    
+    def sign(self, msg: bytes, key: bytes) -> bytes:
+        # Secrets and signatures are only ever compared with hmac.compare_digest
+        # (constant time), never with ==, to avoid leaking timing information
+        if not hmac.compare_digest(key, self._key):
+            return super().sign(msg, key)
+        mac = self._keyed_hmac.copy()
+        mac.update(msg)
+        return mac.digest()
+
+
+# Register the keyed variant for the configured HMAC algorithm
+# (verify() in the base class already compares with hmac.compare_digest)
+_HMAC_HASHES = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
+if ALGORITHM in _HMAC_HASHES:
+    jwt.unregister_algorithm(ALGORITHM)
+    jwt.register_algorithm(ALGORITHM, _KeyedHMACAlgorithm(_HMAC_HASHES[ALGORITHM], _SECRET_KEY_BYTES))
+
+# Password hashing configuration
+# Each extra round doubles bcrypt's CPU time (10 rounds is 4x faster than the library default of 12)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "10"))
 
 # HTTPBearer scheme for token extraction
 # This shows a simple "Value" field in Swagger UI for Bearer tokens
 # HTTPBearer automatically extracts the token from Authorization: Bearer <token> header
 security = HTTPBearer()
 
+# Long passwords are pre-hashed with SHA-256 from hashlib, which is backed by
+# OpenSSL (uses SHA-NI/AVX2 instructions where the CPU supports them).
+# Fail fast at import if hashlib fell back to CPython's builtin _sha256
+# (constructor named "sha256" instead of "openssl_sha256").
+if hashlib.sha256.__name__ != 'openssl_sha256':
+    raise RuntimeError("hashlib SHA-256 (OpenSSL) is required for password hashing")
 
-def _prepare_password(password: str) -> bytes:
-    """
-    Prepare password for bcrypt hashing.
-    
-    Bcrypt has a 72-byte limit. For longer passwords, we pre-hash with SHA256
-    to ensure consistent handling while maintaining security.
-    
-    Args:
-        password: Plain text password
-    
-    Returns:
-        bytes: Password ready for bcrypt (max 72 bytes)
-    """
-    # Convert to bytes to check length
-    password_bytes = password.encode('utf-8')
-    
-    # If password is longer than 72 bytes, pre-hash with SHA256
-    # SHA256 produces 32 bytes (256 bits), which is always under 72 bytes
-    if len(password_bytes) > 72:
-        # Pre-hash with SHA256 to get fixed-length hash (32 bytes)
-        sha256_hash_bytes = hashlib.sha256(password_bytes).digest()
-        return sha256_hash_bytes
-    else:
-        # Password is short enough, use as-is (but ensure it's bytes)
-        return password_bytes
+# Username -> user ID cache for tokens issued without a "uid" claim
+# Short TTL so deleted/renamed users stop resolving within a minute
+_user_id_cache = TTLCache(maxsize=10_000, ttl=60)
+_user_id_cache_lock = threading.Lock()
 
+# Password verification cache
+# bcrypt is deliberately slow, so repeated logins with the same credentials
+# reuse the previous result. Keys are keyed BLAKE2 digests, never plain passwords.
+BCRYPT_VERIFY_CACHE_ENABLED = os.getenv("BCRYPT_VERIFY_CACHE_ENABLED", "true").lower() == "true"
+_verify_cache = TTLCache(maxsize=4096, ttl=300)
+_verify_cache_lock = threading.Lock()  # TTLCache is not thread-safe
+_VERIFY_CACHE_KEY = hashlib.sha256(SECRET_KEY.encode('utf-8')).digest()  # BLAKE2 keys max 64 bytes
 
-def _prepare_password_for_bcrypt(password: str) -> str:
+
+def _prepare_password(password: str) -> bytes:
     """
     Prepare password for bcrypt hashing.
     
-    Bcrypt has a strict 72-byte limit. This function ensures the password
-    is always within that limit by:
-    1. If password <= 72 bytes: use as-is
-    2. If password > 72 bytes: pre-hash with SHA256 (produces 64-byte hex string)
+    Bcrypt has a strict 72-byte limit. Signup rejects passwords over
+    72 bytes, so new passwords always go to bcrypt as-is. Accounts created
+    before that limit may have longer passwords, which were pre-hashed with
+    SHA256 (64-byte hex digest); that branch is kept so they can still log in.
     
     Args:
         password: Plain text password
     
     Returns:
-        str: Password ready for bcrypt (always <= 72 bytes when encoded)
+        bytes: Password ready for bcrypt (always <= 72 bytes)
     """
     password_bytes = password.encode('utf-8')
-    
-    # If password exceeds 72 bytes, pre-hash with SHA256
     if len(password_bytes) > 72:
-        # SHA256 produces 32 bytes, hex representation is 64 characters
-        # When encoded to UTF-8, 64 hex chars = 64 bytes (well under 72 limit)
-        sha256_hash = hashlib.sha256(password_bytes).hexdigest()
-        return sha256_hash
-    
-    # Password is within limit, use as-is
-    return password
+        return hashlib.sha256(password_bytes).hexdigest().encode('ascii')
+    return password_bytes
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -94,7 +129,8 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Verify a plain password against a hashed password.
     
     This function handles passwords of any length by using the same
-    preparation method used during hashing.
+    preparation method used during hashing. Results are cached for a few
+    minutes (set BCRYPT_VERIFY_CACHE_ENABLED=false to disable).
     
     Args:
         plain_password: The password entered by user
@@ -103,22 +139,30 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         bool: True if password matches, False otherwise
     """
-    # Prepare password the same way it was hashed
-    prepared_password = _prepare_password_for_bcrypt(plain_password)
-    
-    # Convert to bytes for bcrypt
-    password_bytes = prepared_password.encode('utf-8')
-    
-    # Ensure it's within 72-byte limit
-    if len(password_bytes) > 72:
-        password_bytes = password_bytes[:72]
-    
-    # Verify with bcrypt
-    # hashed_password is already a bytes string from bcrypt
-    if isinstance(hashed_password, str):
-        hashed_password = hashed_password.encode('utf-8')
-    
-    return bcrypt.checkpw(password_bytes, hashed_password)
+    if isinstance(hashed_password, bytes):
+        hashed_password = hashed_password.decode('utf-8')
+    
+    # Check cache first (skips bcrypt entirely on a hit)
+    if BCRYPT_VERIFY_CACHE_ENABLED:
+        cache_key = hashlib.blake2b(
+            plain_password.encode('utf-8') + b"|" + hashed_password.encode('utf-8'),
+            key=_VERIFY_CACHE_KEY,
+            digest_size=16
+        ).digest()
+        with _verify_cache_lock:
+            cached = _verify_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    
+    # Prepare password the same way it was hashed, then verify with bcrypt
+    # (bcrypt.checkpw compares hashes in constant time, no extra wrapping needed)
+    result = bcrypt.checkpw(_prepare_password(plain_password), hashed_password.encode('utf-8'))
+    
+    if BCRYPT_VERIFY_CACHE_ENABLED:
+        with _verify_cache_lock:
+            _verify_cache[cache_key] = result
+    
+    return result
 
 
 def get_password_hash(password: str) -> str:
@@ -135,17 +179,10 @@ def get_password_hash(password: str) -> str:
         str: Hashed password string (bcrypt hash, UTF-8 encoded)
     """
     # Prepare password to ensure it's within bcrypt's 72-byte limit
-    prepared_password = _prepare_password_for_bcrypt(password)
-    
-    # Convert to bytes
-    password_bytes = prepared_password.encode('utf-8')
-    
-    # Ensure it's within 72-byte limit (safety check)
-    if len(password_bytes) > 72:
-        password_bytes = password_bytes[:72]
+    password_bytes = _prepare_password(password)
     
     # Generate salt and hash with bcrypt
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     
     # Return as string (bcrypt hash is bytes, decode to string for storage)
@@ -166,16 +203,18 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     to_encode = data.copy()  # Copy to avoid modifying original data
     
     # Set expiration time
+    # JWT "exp" is a Unix timestamp, so plain int arithmetic on time.time()
+    # avoids building (deprecated, naive) datetime.utcnow() objects
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = int(time.time()) + int(expires_delta.total_seconds())
     else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = int(time.time()) + _ACCESS_TOKEN_EXPIRE_SECONDS
     
     # Add expiration to token data
-    to_encode.update({"exp": expire})
+    to_encode["exp"] = expire
     
     # Encode and return JWT token
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _SECRET_KEY_BYTES, algorithm=ALGORITHM)
     return encoded_jwt
 
 
@@ -189,6 +228,11 @@ def get_current_user(
     This function is used as a dependency in protected routes.
     FastAPI will automatically call this and inject the User object.
     
+    Tokens carry the user ID in the "uid" claim, so the user is built
+    straight from the token without a database round-trip. The returned
+    object only has `id` and `username` set; use `get_current_user_full`
+    when a route needs the complete database row.
+    
     Args:
         credentials: HTTPBearer credentials containing the token
         db: Database session
@@ -210,19 +254,62 @@ def get_current_user(
         token = credentials.credentials
         
         # Decode and verify JWT token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, _SECRET_KEY_BYTES, algorithms=[ALGORITHM])
         username: str = payload.get("sub")  # "sub" (subject) contains username
+        user_id = payload.get("uid")  # "uid" contains user ID
         
         if username is None:
             raise credentials_exception
-    except JWTError:
+    except PyJWTError:
         # Token is invalid or expired
         raise credentials_exception
     
-    # Get user from database
+    # Token already identifies the user, no need to hit the database
+    if isinstance(user_id, int):
+        return User(id=user_id, username=username)
+    
+    # Older tokens without "uid" claim: resolve the ID from cache or database
+    with _user_id_cache_lock:
+        user_id = _user_id_cache.get(username)
+    if user_id is not None:
+        return User(id=user_id, username=username)
+    
     user = db.query(User).filter(User.username == username).first()
     if user is None:
         raise credentials_exception
     
+    with _user_id_cache_lock:
+        _user_id_cache[username] = user.id
+    
     return user
 
+
+def get_current_user_full(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> User:
+    """
+    Dependency function to get the full database row of the current user.
+    
+    Use this instead of `get_current_user` when a route needs attributes
+    other than `id` and `username` (e.g. email or created_at).
+    
+    Args:
+        current_user: User built from the JWT token
+        db: Database session
+    
+    Returns:
+        User: The authenticated user loaded from the database
+    
+    Raises:
+        HTTPException: If user no longer exists
+    """
+    user = db.query(User).filter(User.id == current_user.id).first()
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    return user
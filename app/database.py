@@ -7,16 +7,42 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-DATABASE_URL = os.getenv("DATABASE_URL", "mysql+pymysql://root@localhost:3306/emo_energy")
+DATABASE_URL = os.getenv("DATABASE_URL", "mysql+mysqldb://root@localhost:3306/emo_energy")
+
+# Connection pool sizing
+# Default QueuePool (5 connections) bottlenecks at moderate concurrency
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "40"))
+
+# Driver-specific connection arguments (utf8mb4 = full Unicode on MySQL)
+# Timestamps are stored as UTC: the session time zone makes NOW() (column
+# server defaults, onupdate) agree with the UTC values the ORM writes
+connect_args = {
+    "charset": "utf8mb4",
+    "init_command": "SET time_zone = '+00:00'",
+} if DATABASE_URL.startswith("mysql") else {}
+
+# QueuePool tuning only applies to MySQL; other backends (e.g. SQLite
+# :memory:, which uses SingletonThreadPool) reject these arguments
+pool_kwargs = {
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_use_lifo": True,  # Reuse the most recently returned (warm) connection first
+} if DATABASE_URL.startswith("mysql") else {}
 
 engine = create_engine(
     DATABASE_URL,
     pool_pre_ping=True,
     pool_recycle=3600,
-    echo=False
+    query_cache_size=1200,  # Compiled SQL statement cache entries
+    connect_args=connect_args,
+    echo=False,
+    **pool_kwargs
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False keeps loaded/inserted attributes usable after commit,
+# so returning a freshly created object doesn't trigger a reload SELECT
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 Base = declarative_base()
 
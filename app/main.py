@@ -5,11 +5,23 @@ This file initializes the FastAPI application, includes routers,
 and sets up middleware for CORS and error handling.
 """
 
-from fastapi import FastAPI
+import json
+import logging
+import os
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.database import engine, Base
 from app.routers import auth, contents
+from app.services.ai_service import close_http_client
+
+# Application logging (uvicorn only configures its own uvicorn.* loggers)
+# Shows the app's INFO messages, e.g. which analysis service was used
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
 
 # Create database tables on startup
 # In production, use Alembic migrations instead
@@ -34,25 +46,36 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+# Close the shared outbound HTTP client (AI service) on shutdown
+app.add_event_handler("shutdown", close_http_client)
+
 # Include routers (API endpoints)
 # These are modular route handlers organized by feature
 app.include_router(auth.router, prefix="/api", tags=["Authentication"])
 app.include_router(contents.router, prefix="/api", tags=["Content Management"])
 
 
+# Pre-serialized bodies for the static endpoints below
+# Load balancers probe these constantly, so skip JSON encoding on every call.
+# A new Response is still created per request because middleware (CORS)
+# appends headers to the response it is given.
+_ROOT_BODY = json.dumps({
+    "message": "Intelligent Content API is running",
+    "docs": "/docs",
+    "version": "1.0.0"
+}).encode("utf-8")
+_HEALTH_BODY = json.dumps({"status": "healthy", "service": "content-api"}).encode("utf-8")
+
+
 @app.get("/")
 async def root():
     """
     Root endpoint - health check.
     
     Returns:
-        dict: A simple message indicating the API is running
+        Response: A simple JSON message indicating the API is running
     """
-    return {
-        "message": "Intelligent Content API is running",
-        "docs": "/docs",
-        "version": "1.0.0"
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
 @app.get("/health")
@@ -61,7 +84,7 @@ async def health_check():
     Health check endpoint for monitoring.
     
     Returns:
-        dict: Status of the API service
+        Response: JSON status of the API service
     """
-    return {"status": "healthy", "service": "content-api"}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
@@ -5,12 +5,25 @@ These classes represent database tables. SQLAlchemy automatically
 creates tables based on these model definitions.
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, Enum as SQLEnum
+from sqlalchemy import Column, Integer, SmallInteger, String, DateTime, Text, Index
+from sqlalchemy.dialects.mysql import TINYINT
 from sqlalchemy.sql import func
+from sqlalchemy.types import TypeDecorator
+from datetime import datetime, timezone
 from app.database import Base
 import enum
 
 
+def _utcnow() -> datetime:
+    """
+    Current UTC time, used as a Python-side default so inserts don't need a refetch.
+    
+    Truncated to whole seconds to match what a MySQL DATETIME column stores,
+    so the value returned right after INSERT equals the one read back later.
+    """
+    return datetime.now(timezone.utc).replace(microsecond=0)
+
+
 class SentimentType(str, enum.Enum):
     """
     Enumeration for sentiment types.
@@ -22,6 +35,56 @@ class SentimentType(str, enum.Enum):
     NEUTRAL = "Neutral"
 
 
+class SentimentCode(TypeDecorator):
+    """
+    Stores SentimentType as a small integer code instead of a string.
+    
+    A fixed 1-byte column (TINYINT on MySQL) keeps rows smaller and makes
+    filtering an integer comparison. Python code still sees SentimentType.
+    
+    Codes:
+        0: Negative
+        1: Neutral
+        2: Positive
+    """
+    impl = SmallInteger
+    cache_ok = True
+    
+    _TO_CODE = {
+        SentimentType.NEGATIVE: 0,
+        SentimentType.NEUTRAL: 1,
+        SentimentType.POSITIVE: 2,
+    }
+    _FROM_CODE = {code: sentiment for sentiment, code in _TO_CODE.items()}
+    
+    def load_dialect_impl(self, dialect):
+        """Use a 1-byte TINYINT on MySQL, SMALLINT elsewhere."""
+        if dialect.name == "mysql":
+            return dialect.type_descriptor(TINYINT())
+        return dialect.type_descriptor(SmallInteger())
+    
+    def process_bind_param(self, value, dialect):
+        """Convert SentimentType (or its string value) to its integer code."""
+        if value is None:
+            return None
+        return self._TO_CODE[SentimentType(value)]
+    
+    def process_result_value(self, value, dialect):
+        """
+        Convert an integer code from the database back to SentimentType.
+        
+        Rows written before the column was migrated may still hold the old
+        enum label ("POSITIVE" or "Positive"); those are read as well.
+        """
+        if value is None:
+            return None
+        if isinstance(value, str):
+            if value.isdigit():
+                return self._FROM_CODE[int(value)]
+            return SentimentType[value.upper()]
+        return self._FROM_CODE[value]
+
+
 class User(Base):
     """
     User model - stores user account information.
@@ -36,7 +99,11 @@ class User(Base):
     __tablename__ = "users"  # Table name in database
     
     id = Column(Integer, primary_key=True, index=True)
-    username = Column(String(50), unique=True, index=True, nullable=False)
+    # Case-insensitive like MySQL's default collation (SQLite needs NOCASE for that)
+    username = Column(
+        String(50).with_variant(String(50, collation="NOCASE"), "sqlite"),
+        unique=True, index=True, nullable=False
+    )
     email = Column(String(100), unique=True, index=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -56,12 +123,19 @@ class Content(Base):
         updated_at: When content was last updated
     """
     __tablename__ = "contents"
+    __table_args__ = (
+        # Serves "this user's contents, newest first" listing without a filesort
+        # (also covers plain user_id lookups, so no separate user_id index)
+        Index("ix_contents_user_id_id", "user_id", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, nullable=False, index=True)  # Foreign key to users table
+    user_id = Column(Integer, nullable=False)  # Foreign key to users table
     text = Column(Text, nullable=False)  # Text can be long, so use Text type
     summary = Column(Text, nullable=True)  # Will be populated by AI
-    sentiment = Column(SQLEnum(SentimentType), nullable=True)  # Enum for type safety
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sentiment = Column(SentimentCode, nullable=True)  # Stored as 1-byte code, read as SentimentType
+    # Python-side default: value is known after INSERT without a SELECT
+    # (server_default kept for rows inserted outside the ORM)
+    created_at = Column(DateTime(timezone=True), default=_utcnow, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())  # Auto-update on change
 
@@ -7,9 +7,10 @@ This module contains endpoints for:
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from datetime import timedelta
 
 from app.database import get_db
 from app.models import User
@@ -18,7 +19,7 @@ from app.auth import (
     get_password_hash,
     verify_password,
     create_access_token,
-    ACCESS_TOKEN_EXPIRE_MINUTES
+    ACCESS_TOKEN_EXPIRE
 )
 
 # Create router for authentication endpoints
@@ -46,24 +47,29 @@ async def signup(user_data: UserSignup, db: Session = Depends(get_db)):
     Raises:
         HTTPException: If username or email already exists
     """
-    # Check if username already exists
-    existing_user = db.query(User).filter(User.username == user_data.username).first()
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already registered"
+    # Check if username or email already exists (single query)
+    # The username match is computed by the database so it follows the
+    # column collation (case-insensitive), same as the unique constraint
+    existing = db.query(
+        (User.username == user_data.username).label("username_taken")
+    ).filter(
+        or_(User.username == user_data.username, User.email == user_data.email)
+    ).first()
+    if existing:
+        detail = (
+            "Username already registered"
+            if existing.username_taken
+            else "Email already registered"
         )
-    
-    # Check if email already exists
-    existing_email = db.query(User).filter(User.email == user_data.email).first()
-    if existing_email:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
+            detail=detail
         )
     
     # Create new user object
-    hashed_password = get_password_hash(user_data.password)
+    # bcrypt is CPU-bound, run it in a worker thread so the event loop
+    # keeps serving other requests while the hash is computed
+    hashed_password = await run_in_threadpool(get_password_hash, user_data.password)
     new_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -73,8 +79,7 @@ async def signup(user_data: UserSignup, db: Session = Depends(get_db)):
     # Save to database
     try:
         db.add(new_user)
-        db.commit()  # Commit transaction
-        db.refresh(new_user)  # Refresh to get auto-generated ID
+        db.commit()  # Commit transaction (auto-generated ID is set from the INSERT)
     except IntegrityError:
         # Handle race condition (if user was created between checks)
         db.rollback()
@@ -84,10 +89,9 @@ async def signup(user_data: UserSignup, db: Session = Depends(get_db)):
         )
     
     # Create access token for the new user
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": new_user.username},  # "sub" = subject (username)
-        expires_delta=access_token_expires
+        data={"sub": new_user.username, "uid": new_user.id},  # "sub" = subject (username), "uid" = user ID
+        expires_delta=ACCESS_TOKEN_EXPIRE
     )
     
     # Return token
@@ -121,7 +125,10 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.username == user_credentials.username).first()
     
     # Check if user exists and password is correct
-    if not user or not verify_password(user_credentials.password, user.hashed_password):
+    # (bcrypt runs in a worker thread to avoid blocking the event loop)
+    if not user or not await run_in_threadpool(
+        verify_password, user_credentials.password, user.hashed_password
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -129,10 +136,9 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
         )
     
     # Create access token
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.username},
-        expires_delta=access_token_expires
+        data={"sub": user.username, "uid": user.id},
+        expires_delta=ACCESS_TOKEN_EXPIRE
     )
     
     return {
@@ -8,7 +8,10 @@ This module contains endpoints for:
 - Deleting content
 """
 
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from sqlalchemy import select, func, bindparam
 from sqlalchemy.orm import Session
 
 from app.database import get_db
@@ -20,6 +23,30 @@ from app.services.ai_service import analyze_text
 # Create router for content endpoints
 router = APIRouter()
 
+# Background analysis runs after the response is sent, so its outcome and
+# failures are only visible in the log
+logger = logging.getLogger(__name__)
+
+# Pre-built statements for the hot read paths
+# Built once at import; SQLAlchemy caches their compiled SQL, so each request
+# only binds parameters instead of constructing and compiling a new query
+_GET_CONTENT_STMT = select(Content).where(
+    Content.id == bindparam("content_id"),
+    Content.user_id == bindparam("user_id")
+)
+
+_LIST_CONTENTS_STMT = (
+    select(Content, func.count().over().label("total"))
+    .where(Content.user_id == bindparam("user_id"))
+    .order_by(Content.id.desc())
+    .offset(bindparam("skip"))
+    .limit(bindparam("limit"))
+)
+
+_COUNT_CONTENTS_STMT = select(func.count()).select_from(Content).where(
+    Content.user_id == bindparam("user_id")
+)
+
 
 async def process_content_ai(content_id: int, text: str):
     """
@@ -44,26 +71,25 @@ async def process_content_ai(content_id: int, text: str):
     try:
         result = await analyze_text(text)
         
-        print(f"Analysis result for content {content_id}: summary={result.get('summary')[:50] if result.get('summary') else 'None'}..., sentiment={result.get('sentiment')}")
-        
         content = db.query(Content).filter(Content.id == content_id).first()
         if content:
             summary_value = result.get("summary")
             sentiment_value = result.get("sentiment")
             
-            print(f"Updating content {content_id}: summary='{summary_value}', sentiment={sentiment_value}")
+            logger.debug(
+                "Updating content %s: summary=%.50r, sentiment=%s",
+                content_id, summary_value, sentiment_value
+            )
             
             content.summary = summary_value
             content.sentiment = sentiment_value
             db.commit()
             
-            print(f"Content {content_id} updated successfully")
+            logger.debug("Content %s updated successfully", content_id)
         else:
-            print(f"Content {content_id} not found in database")
-    except Exception as e:
-        print(f"Processing failed for content {content_id}: {e}")
-        import traceback
-        traceback.print_exc()
+            logger.warning("Content %s not found in database", content_id)
+    except Exception:
+        logger.exception("Processing failed for content %s", content_id)
         db.rollback()  # Rollback on error
         # Optionally, you could mark the content with an error status
     finally:
@@ -108,10 +134,13 @@ async def create_content(
         text=content_data.text
     )
     
-    # Save to database
+    # Save to database in a single INSERT
+    # SQLAlchemy emits INSERT ... RETURNING where the backend supports it
+    # (MariaDB 10.5+, SQLite) and reads the cursor's lastrowid on MySQL, so
+    # the ID comes back with the INSERT either way. created_at is set in
+    # Python, so the object is complete after commit (no refresh SELECT).
     db.add(new_content)
     db.commit()
-    db.refresh(new_content)  # Refresh to get auto-generated ID
     
     # Add background task for processing
     # This runs asynchronously and doesn't block the response
@@ -132,7 +161,7 @@ async def get_contents(
     Get all content for the authenticated user.
     
     This endpoint returns a paginated list of all content
-    submitted by the current user.
+    submitted by the current user, newest first.
     
     Args:
         current_user: Authenticated user
@@ -143,15 +172,20 @@ async def get_contents(
     Returns:
         ContentListResponse: List of contents and total count
     """
-    # Query contents for current user only
-    contents = db.query(Content).filter(
-        Content.user_id == current_user.id
-    ).offset(skip).limit(limit).all()
+    # Query contents for current user only, with the total count computed
+    # in the same query by a window function (one round-trip instead of two)
+    rows = db.execute(
+        _LIST_CONTENTS_STMT,
+        {"user_id": current_user.id, "skip": skip, "limit": limit}
+    ).all()
     
-    # Get total count
-    total = db.query(Content).filter(
-        Content.user_id == current_user.id
-    ).count()
+    contents = [row.Content for row in rows]
+    if rows:
+        total = rows[0].total
+    else:
+        # Empty page (past the end, limit=0 or no contents): no rows to
+        # read the count from
+        total = db.execute(_COUNT_CONTENTS_STMT, {"user_id": current_user.id}).scalar_one()
     
     return {
         "contents": contents,
@@ -182,10 +216,10 @@ async def get_content(
         HTTPException: If content not found or doesn't belong to user
     """
     # Find content by ID and user_id (security: users can only access their own content)
-    content = db.query(Content).filter(
-        Content.id == content_id,
-        Content.user_id == current_user.id
-    ).first()
+    content = db.execute(
+        _GET_CONTENT_STMT,
+        {"content_id": content_id, "user_id": current_user.id}
+    ).scalar_one_or_none()
     
     if not content:
         raise HTTPException(
@@ -216,10 +250,10 @@ async def delete_content(
         HTTPException: If content not found or doesn't belong to user
     """
     # Find content by ID and user_id
-    content = db.query(Content).filter(
-        Content.id == content_id,
-        Content.user_id == current_user.id
-    ).first()
+    content = db.execute(
+        _GET_CONTENT_STMT,
+        {"content_id": content_id, "user_id": current_user.id}
+    ).scalar_one_or_none()
     
     if not content:
         raise HTTPException(
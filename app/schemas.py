@@ -5,9 +5,9 @@ Pydantic ensures data types are correct and validates input/output.
 These schemas define the structure of API requests and responses.
 """
 
-from pydantic import BaseModel, EmailStr, Field, field_validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from app.models import SentimentType
 
 
@@ -21,13 +21,17 @@ class UserSignup(BaseModel):
         username: Must be unique, used for login (3-50 characters)
         email: Must be valid email format and unique
         password: Plain text password (will be hashed before storage)
-                  Minimum 6 characters, maximum 200 characters
-                  Note: Passwords longer than 72 bytes are automatically
-                  pre-hashed with SHA256 before bcrypt hashing
+                  Minimum 6 characters, maximum 72 bytes (UTF-8)
+                  Note: 72 bytes is bcrypt's input limit, so new passwords
+                  are hashed directly without a SHA256 pre-hash
+    
+    Passwords are hashed with bcrypt using BCRYPT_ROUNDS rounds (default 10).
+    Each extra round doubles the time to hash and to verify, which slows down
+    both brute-force attacks and every signup/login request.
     """
     username: str = Field(..., min_length=3, max_length=50, description="Username (3-50 characters)")
     email: EmailStr = Field(..., description="Valid email address")
-    password: str = Field(..., min_length=6, max_length=200, description="Password (6-200 characters)")
+    password: str = Field(..., min_length=6, max_length=72, description="Password (6 characters to 72 bytes)")
     
     @field_validator('password')
     @classmethod
@@ -35,13 +39,13 @@ class UserSignup(BaseModel):
         """
         Validate password length.
         
-        Ensures password is between 6 and 200 characters.
-        Longer passwords are handled automatically by pre-hashing.
+        Ensures password is at least 6 characters and at most 72 bytes
+        when UTF-8 encoded (non-ASCII characters take several bytes).
         """
         if len(v) < 6:
             raise ValueError('Password must be at least 6 characters long')
-        if len(v) > 200:
-            raise ValueError('Password cannot exceed 200 characters')
+        if len(v.encode('utf-8')) > 72:
+            raise ValueError('Password too long (max 72 bytes UTF-8)')
         return v
 
 
@@ -96,6 +100,8 @@ class ContentResponse(BaseModel):
     Config:
         from_attributes: Allows conversion from SQLAlchemy models
     """
+    model_config = ConfigDict(from_attributes=True)
+    
     id: int
     text: str
     summary: Optional[str]
@@ -103,8 +109,19 @@ class ContentResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime]
     
-    class Config:
-        from_attributes = True  # Allows Pydantic to read from SQLAlchemy models
+    @field_validator('created_at', 'updated_at')
+    @classmethod
+    def assume_utc(cls, v: Optional[datetime]) -> Optional[datetime]:
+        """
+        Mark stored timestamps as UTC.
+        
+        Timestamps are written in UTC, but DATETIME columns (MySQL, SQLite)
+        return them without a time zone. Attaching UTC makes a freshly created
+        object and one read back from the database serialize the same way.
+        """
+        if v is not None and v.tzinfo is None:
+            return v.replace(tzinfo=timezone.utc)
+        return v
 
 
 class ContentListResponse(BaseModel):
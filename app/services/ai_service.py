@@ -10,14 +10,38 @@ OpenAI API is optional fallback.
 """
 
 import os
+import json
+import asyncio
 import httpx
 import re
-from typing import Dict, Optional
+import time
+import logging
+import hashlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
 from dotenv import load_dotenv
 from app.models import SentimentType
 
+try:
+    import ahocorasick  # Optional: C automaton for keyword scanning
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson  # Optional: faster JSON decoding of API responses
+except ImportError:
+    orjson = None
+
 load_dotenv()
 
+# Records which service/model answered and why fallbacks were used
+logger = logging.getLogger(__name__)
+
+# Sentiment members bound once (one global lookup instead of enum attribute access)
+_POS = SentimentType.POSITIVE
+_NEG = SentimentType.NEGATIVE
+_NEU = SentimentType.NEUTRAL
+
 # API Configuration
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 HUGGINGFACE_API_KEY = os.getenv("HUGGINGFACE_API_KEY")
@@ -25,6 +49,135 @@ OPENAI_API_URL = "https://api.openai.com/v1/chat/completions"
 # HuggingFace Router API endpoint (updated endpoint)
 HUGGINGFACE_API_BASE = "https://router.huggingface.co"
 
+# Per-request timeouts (seconds)
+OPENAI_TIMEOUT = 30.0
+HUGGINGFACE_TIMEOUT = 60.0  # Increased timeout for model loading
+
+# HuggingFace models, tried in order until one works
+HF_SUMMARY_MODELS = (
+    "facebook/bart-large-cnn",  # Best for summarization
+    "sshleifer/distilbart-cnn-12-6",  # Faster alternative
+)
+HF_SENTIMENT_MODELS = (
+    "cardiffnlp/twitter-roberta-base-sentiment-latest",  # Best for social media text
+    "distilbert-base-uncased-finetuned-sst-2-english",  # Reliable alternative
+)
+
+# HuggingFace request batching (off by default)
+# With HF_BATCH_WINDOW_MS > 0, texts arriving within the window are sent to
+# each model as one {"inputs": [...]} request instead of one request per text
+HF_BATCH_WINDOW = float(os.getenv("HF_BATCH_WINDOW_MS", "0")) / 1000
+HF_BATCH_MAX = 16
+
+# Shared HTTP client
+# Reusing one client keeps TCP/TLS connections alive between calls and lets
+# HTTP/2 multiplex concurrent requests to the same host over one connection
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=32),
+            headers={"User-Agent": "emo-energy/1.0"},
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client (called on application shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+# HuggingFace result cache
+# Identical texts skip both API calls; entries expire after HF_CACHE_TTL seconds
+HF_CACHE_MAX = 1024
+HF_CACHE_TTL = int(os.getenv("HF_CACHE_TTL", "3600"))
+_hf_cache: "OrderedDict[str, Tuple[float, Dict[str, Optional[str]]]]" = OrderedDict()
+
+# In-flight analyses keyed by text fingerprint
+# Concurrent requests for the same text wait on the first one instead of
+# firing their own API calls
+_inflight: Dict[str, "asyncio.Future[Dict[str, Optional[str]]]"] = {}
+
+# HuggingFace model cool-down
+# A model that is loading (503) or unreachable is skipped until its cool-down
+# expires, instead of every request waiting on it again
+HF_MODEL_COOLDOWN = 30.0  # Minimum seconds to skip a cold model
+_model_cooldown: Dict[str, float] = {}
+
+
+def _model_available(model: str) -> bool:
+    """Return whether a HuggingFace model is outside its cool-down window."""
+    return _model_cooldown.get(model, 0.0) <= time.monotonic()
+
+
+def _cool_down_model(model: str, estimated_time: float = 0.0) -> None:
+    """Skip a HuggingFace model for max(estimated_time, HF_MODEL_COOLDOWN) seconds."""
+    try:
+        delay = max(float(estimated_time), HF_MODEL_COOLDOWN)
+    except (TypeError, ValueError):
+        delay = HF_MODEL_COOLDOWN
+    _model_cooldown[model] = time.monotonic() + delay
+
+
+def reset_cooldowns() -> None:
+    """Clear all HuggingFace model cool-downs (used by tests)."""
+    _model_cooldown.clear()
+
+
+def _json(response: httpx.Response):
+    """Decode a JSON response body (orjson when installed, else stdlib json)."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def _json_bytes(data) -> bytes:
+    """Encode a request body as JSON bytes (orjson when installed, else stdlib json)."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _text_fingerprint(text: str) -> str:
+    """Return a short, fixed-size cache key for a text."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _hf_cache_get(key: str) -> Optional[Dict[str, Optional[str]]]:
+    """Return a cached analysis result, or None if missing or expired."""
+    entry = _hf_cache.get(key)
+    if entry is None:
+        return None
+    
+    stored_at, result = entry
+    if time.monotonic() - stored_at > HF_CACHE_TTL:
+        del _hf_cache[key]
+        return None
+    
+    _hf_cache.move_to_end(key)  # Mark as recently used
+    return dict(result)
+
+
+def _hf_cache_put(key: str, result: Dict[str, Optional[str]]) -> None:
+    """Store an analysis result, evicting the least recently used entry when full."""
+    _hf_cache[key] = (time.monotonic(), dict(result))
+    _hf_cache.move_to_end(key)
+    if len(_hf_cache) > HF_CACHE_MAX:
+        _hf_cache.popitem(last=False)
+
+
+# "Summary: ..." and "Sentiment: ..." lines, matched independently so
+# extra lines between them or a reversed order still parse
+_OPENAI_SUMMARY_RE = re.compile(r"^Summary:(.*)$", re.MULTILINE)
+_OPENAI_SENTIMENT_RE = re.compile(r"^Sentiment:(.*)$", re.MULTILINE)
+
 
 async def analyze_with_openai(text: str) -> Dict[str, Optional[str]]:
     """
@@ -73,37 +226,183 @@ Sentiment: [Positive/Negative/Neutral]"""
         "temperature": 0.7
     }
     
-    # Make async HTTP request
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.post(OPENAI_API_URL, json=payload, headers=headers)
-        response.raise_for_status()  # Raise exception if HTTP error
+    # Make async HTTP request (shared client, keeps the connection alive)
+    client = _get_client()
+    response = await client.post(OPENAI_API_URL, json=payload, headers=headers, timeout=OPENAI_TIMEOUT)
+    response.raise_for_status()  # Raise exception if HTTP error
+    
+    result = _json(response)
+    content = result["choices"][0]["message"]["content"]
+    
+    # Parse the response
+    summary = None
+    sentiment = None
+    
+    summary_match = _OPENAI_SUMMARY_RE.search(content)
+    if summary_match:
+        summary = summary_match.group(1).strip()
+    
+    sentiment_match = _OPENAI_SENTIMENT_RE.search(content)
+    if sentiment_match:
+        sentiment_str = sentiment_match.group(1)
+        # Map to our SentimentType enum
+        if "Positive" in sentiment_str:
+            sentiment = _POS
+        elif "Negative" in sentiment_str:
+            sentiment = _NEG
+        else:
+            sentiment = _NEU
+    
+    return {
+        "summary": summary or "Summary not available",
+        "sentiment": sentiment or _NEU
+    }
+
+
+def _hf_headers() -> Dict[str, str]:
+    """Request headers for the HuggingFace API (API key, JSON body)."""
+    return {
+        "Authorization": f"Bearer {HUGGINGFACE_API_KEY}",
+        "Content-Type": "application/json"
+    }
+
+
+class _HFBatcher:
+    """
+    Collect texts for HF_BATCH_WINDOW seconds and analyze them together.
+    
+    Each model gets one request with all collected texts as its inputs.
+    submit() returns (summary, sentiment) for a text, or None when the text
+    has to take the single-text path (it arrived alone, or the batched
+    requests failed).
+    """
+    
+    def __init__(self):
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Running batch tasks (the loop only keeps weak references to tasks)
+        self._tasks: Set[asyncio.Task] = set()
+    
+    async def submit(self, text: str) -> Optional[Tuple[Optional[str], Optional[SentimentType]]]:
+        """Queue a text for the next batch and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= HF_BATCH_MAX:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(HF_BATCH_WINDOW, self._flush)
+        return await future
+    
+    def _flush(self) -> None:
+        """Send the pending texts as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
         
-        result = response.json()
-        content = result["choices"][0]["message"]["content"]
+        if len(batch) == 1:
+            # Nothing to batch with, the single-text path handles it
+            _, future = batch[0]
+            if not future.done():
+                future.set_result(None)
+            return
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Analyze a batch and resolve each waiter with its own result."""
+        try:
+            results = await _hf_analyze_batch([text for text, _ in batch])
+        except Exception as e:
+            logger.warning("HuggingFace batch failed: %s", e)
+            results = None
         
-        # Parse the response
-        summary = None
-        sentiment = None
+        for i, (_, future) in enumerate(batch):
+            if not future.done():
+                future.set_result(results[i] if results is not None else None)
+
+
+_hf_batcher = _HFBatcher()
+
+
+async def _hf_analyze_batch(texts: List[str]) -> Optional[List[Tuple[Optional[str], Optional[SentimentType]]]]:
+    """
+    Summarize and classify several texts with one request per model.
+    
+    Args:
+        texts: The text contents to analyze
+    
+    Returns:
+        list: (summary, sentiment) per text, or None if either model kind
+        didn't return one output per text
+    """
+    # Limit text length for free tier, same as the single-text path
+    payload = _json_bytes({"inputs": [text[:512] for text in texts]})
+    client = _get_client()
+    summaries, sentiments = await asyncio.gather(
+        _hf_post_batch(client, HF_SUMMARY_MODELS, payload, len(texts)),
+        _hf_post_batch(client, HF_SENTIMENT_MODELS, payload, len(texts)),
+    )
+    if summaries is None or sentiments is None:
+        return None
+    
+    results = []
+    for summary_data, scores in zip(summaries, sentiments):
+        # Sentiment outputs are a score list per text, or just the top label
+        if isinstance(scores, dict):
+            scores = [scores]
+        sentiment = _sentiment_from_scores(scores) if isinstance(scores, list) and scores else None
+        results.append((_extract_summary(summary_data), sentiment))
+    return results
+
+
+async def _hf_post_batch(client: httpx.AsyncClient, models: Tuple[str, ...], payload: bytes, count: int) -> Optional[list]:
+    """
+    Send a batched request to the first model that returns one output per input.
+    
+    Args:
+        client: HTTP client to send requests with
+        models: Models to try in order
+        payload: JSON request body with a list of inputs
+        count: Number of inputs in the payload
+    
+    Returns:
+        list: The per-input outputs, or None if no model produced them
+    """
+    for model in models:
+        if not _model_available(model):
+            continue
+        try:
+            response = await client.post(
+                f"{HUGGINGFACE_API_BASE}/models/{model}",
+                content=payload,
+                headers=_hf_headers(),
+                timeout=HUGGINGFACE_TIMEOUT
+            )
+        except Exception as e:
+            logger.warning("Exception calling %s (batch): %s", model, e)
+            _cool_down_model(model)
+            continue
         
-        # Extract summary and sentiment from response
-        lines = content.split("\n")
-        for line in lines:
-            if line.startswith("Summary:"):
-                summary = line.replace("Summary:", "").strip()
-            elif line.startswith("Sentiment:"):
-                sentiment_str = line.replace("Sentiment:", "").strip()
-                # Map to our SentimentType enum
-                if "Positive" in sentiment_str:
-                    sentiment = SentimentType.POSITIVE
-                elif "Negative" in sentiment_str:
-                    sentiment = SentimentType.NEGATIVE
-                else:
-                    sentiment = SentimentType.NEUTRAL
+        logger.debug("HuggingFace batch API status (%s): %s", model, response.status_code)
+        try:
+            data = _json(response)
+        except Exception:
+            data = None
+        if response.status_code == 503:
+            _cool_down_model(model, data.get("estimated_time", 0) if isinstance(data, dict) else 0)
+            continue
+        if response.status_code not in (200, 410):
+            continue
         
-        return {
-            "summary": summary or "Summary not available",
-            "sentiment": sentiment or SentimentType.NEUTRAL
-        }
+        # Router format {"outputs": [...]} or a plain list
+        if isinstance(data, dict):
+            data = data.get("outputs")
+        if isinstance(data, list) and len(data) == count:
+            return data
+    return None
 
 
 async def analyze_with_huggingface(text: str) -> Dict[str, Optional[str]]:
@@ -124,311 +423,403 @@ async def analyze_with_huggingface(text: str) -> Dict[str, Optional[str]]:
     if not HUGGINGFACE_API_KEY:
         raise ValueError("HuggingFace API key not configured")
     
-    headers = {
-        "Authorization": f"Bearer {HUGGINGFACE_API_KEY}"
-    }
+    # Return cached result for identical text (skips both API calls)
+    cache_key = _text_fingerprint(text)
+    cached = _hf_cache_get(cache_key)
+    if cached is not None:
+        return cached
     
-    async with httpx.AsyncClient(timeout=60.0) as client:  # Increased timeout for model loading
-        # Get summary using summarization model
-        # Try multiple reliable models in order
-        summary_models = [
-            "facebook/bart-large-cnn",  # Best for summarization
-            "sshleifer/distilbart-cnn-12-6",  # Faster alternative
-        ]
+    # Batched path (when enabled): None means this text goes on its own
+    batched = await _hf_batcher.submit(text) if HF_BATCH_WINDOW > 0 else None
+    if batched is not None:
+        summary, sentiment = batched
+        sentiment = sentiment or _NEU
+    else:
+        # Both models get the same truncated input (limit text length for free tier),
+        # encoded once and reused for every model attempt
+        payload = _json_bytes({"inputs": text[:512]})
         
+        # Summary and sentiment are independent requests, so run them
+        # concurrently: total latency is the slower of the two, not the sum
+        client = _get_client()
+        summary, sentiment = await asyncio.gather(
+            _hf_summary(client, payload, _hf_headers()),
+            _hf_sentiment(client, payload, _hf_headers()),
+            return_exceptions=True
+        )
+    
+    if isinstance(summary, Exception):
+        logger.warning("HuggingFace summary failed: %s", summary)
         summary = None
-        summary_payload = {
-            "inputs": text[:512]  # Limit text length for free tier
-        }
-        
-        # Try each model until one works
-        for model in summary_models:
-            try:
-                print(f"Calling HuggingFace summary API: {model}")
-                # Router API format: https://router.huggingface.co/models/{model_name}
-                summary_response = await client.post(
-                    f"{HUGGINGFACE_API_BASE}/models/{model}",
-                    json=summary_payload,
-                    headers=headers
-                )
-                
-                print(f"HuggingFace summary API status ({model}): {summary_response.status_code}")
-                
-                if summary_response.status_code == 200:
-                    try:
-                        summary_data = summary_response.json()
-                        print(f"HuggingFace summary response type: {type(summary_data)}")
-                        print(f"HuggingFace summary response (first 500 chars): {str(summary_data)[:500]}")
-                        
-                        # Parse response - handle all formats
-                        if isinstance(summary_data, dict):
-                            # Check for error first
-                            if "error" in summary_data:
-                                error_msg = summary_data.get("error", "Unknown error")
-                                estimated_time = summary_data.get("estimated_time", 0)
-                                print(f"HuggingFace model loading: {error_msg} (estimated time: {estimated_time}s)")
-                                continue  # Try next model
-                            # New Router Format: {"outputs": [...]}
-                            elif "outputs" in summary_data:
-                                outputs = summary_data["outputs"]
-                                if isinstance(outputs, list) and len(outputs) > 0:
-                                    obj = outputs[0]
-                                    if isinstance(obj, dict):
-                                        summary = obj.get("summary_text") or obj.get("generated_text")
-                                    elif isinstance(obj, str):
-                                        summary = obj
-                            # Direct dict response
-                            elif "summary_text" in summary_data:
-                                summary = summary_data["summary_text"]
-                            elif "generated_text" in summary_data:
-                                summary = summary_data["generated_text"]
-                        # Old list format
-                        elif isinstance(summary_data, list) and len(summary_data) > 0:
-                            obj = summary_data[0]
-                            if isinstance(obj, dict):
-                                summary = obj.get("summary_text") or obj.get("generated_text")
-                            elif isinstance(obj, str):
-                                summary = obj
-                        # Direct string response
-                        elif isinstance(summary_data, str):
-                            summary = summary_data
-                        
-                        if summary:
-                            print(f"✅ Got summary from {model}: {summary[:100]}...")
-                            break  # Success, stop trying other models
-                    except Exception as e:
-                        print(f"Error parsing HuggingFace summary response ({model}): {e}")
-                        continue  # Try next model
-                elif summary_response.status_code == 503:
-                    # Model is loading - try next model
-                    try:
-                        error_data = summary_response.json()
-                        error_msg = error_data.get("error", "Model unavailable")
-                        estimated_time = error_data.get("estimated_time", 0)
-                        print(f"HuggingFace model loading ({model}, 503): {error_msg} (estimated time: {estimated_time}s)")
-                    except:
-                        print(f"HuggingFace model loading ({model}, 503): Model is starting up...")
-                    continue  # Try next model
-                elif summary_response.status_code == 404:
-                    print(f"Model {model} not found (404), trying next model...")
-                    continue  # Try next model
-                elif summary_response.status_code == 410:
-                    # Deprecated endpoint warning - check if response body has data anyway
-                    try:
-                        response_text = summary_response.text
-                        print(f"HuggingFace API deprecated warning ({model}): 410")
-                        print(f"Response body preview: {response_text[:300]}")
-                        
-                        # Try to parse response body - sometimes data is still there
-                        try:
-                            summary_data = summary_response.json()
-                            # Check if it's an error message
-                            if isinstance(summary_data, dict) and "error" in summary_data:
-                                error_msg = summary_data.get("error", "")
-                                print(f"Error message: {error_msg}")
-                                # If it's just a deprecation warning, the API might still work
-                                # But we need to use router endpoint or different approach
-                            else:
-                                # Try to extract summary from response
-                                if isinstance(summary_data, dict):
-                                    if "outputs" in summary_data:
-                                        outputs = summary_data["outputs"]
-                                        if isinstance(outputs, list) and len(outputs) > 0:
-                                            obj = outputs[0]
-                                            if isinstance(obj, dict):
-                                                summary = obj.get("summary_text") or obj.get("generated_text")
-                                            elif isinstance(obj, str):
-                                                summary = obj
-                                    elif "summary_text" in summary_data:
-                                        summary = summary_data["summary_text"]
-                                    elif "generated_text" in summary_data:
-                                        summary = summary_data["generated_text"]
-                                elif isinstance(summary_data, list) and len(summary_data) > 0:
-                                    obj = summary_data[0]
-                                    if isinstance(obj, dict):
-                                        summary = obj.get("summary_text") or obj.get("generated_text")
-                                    elif isinstance(obj, str):
-                                        summary = obj
-                                
-                                if summary:
-                                    print(f"✅ Got summary from {model} despite 410: {summary[:100]}...")
-                                    break
-                        except Exception as parse_error:
-                            print(f"Could not parse 410 response: {parse_error}")
-                    except Exception as e:
-                        print(f"Error handling 410 response: {e}")
-                    continue  # Try next model
-                else:
-                    # Other error status
-                    try:
-                        error_data = summary_response.json()
-                        print(f"HuggingFace summary API error ({model}, {summary_response.status_code}): {error_data}")
-                    except:
-                        print(f"HuggingFace summary API error ({model}, {summary_response.status_code})")
-                    continue  # Try next model
-            except Exception as e:
-                print(f"Exception calling {model}: {e}")
+    if isinstance(sentiment, Exception):
+        logger.warning("HuggingFace sentiment failed: %s", sentiment)
+        sentiment = _NEU
+    
+    # Only results backed by a model summary are cached, so a temporary
+    # API outage doesn't pin the fallback result for the whole TTL
+    summary_from_model = bool(summary)
+    
+    # Fallback: Generate simple summary if AI failed
+    if not summary:
+        summary = _generate_fallback_summary(text)
+        logger.info("Using fallback summary generation")
+        logger.debug("Generated fallback summary: %.100s...", summary)
+    
+    # Ensure summary is not None or empty
+    if not summary:
+        summary = "Summary not available"
+        logger.warning("Fallback summary generation returned empty, using default")
+    
+    # Fallback: Use keyword-based sentiment if AI failed
+    if sentiment == _NEU and summary != "Summary not available":
+        sentiment = _detect_sentiment_keywords(text)
+        logger.debug("Using keyword-based sentiment: %s", sentiment.value)
+    
+    logger.debug("Final result - Summary: %.50s..., Sentiment: %s", summary, sentiment)
+    
+    result = {
+        "summary": summary,
+        "sentiment": sentiment
+    }
+    if summary_from_model:
+        _hf_cache_put(cache_key, result)
+    
+    return result
+
+
+def _first_output(data):
+    """Return the first element of a non-empty list, or None."""
+    if isinstance(data, list) and data:
+        return data[0]
+    return None
+
+
+def _extract_summary(data) -> Optional[str]:
+    """
+    Extract the summary text from a HuggingFace summarization response.
+    
+    Handles the Router format ({"outputs": [...]}), direct dicts
+    ({"summary_text": ...} or {"generated_text": ...}), the old list
+    format ([{...}] or ["..."]) and plain strings.
+    
+    Args:
+        data: Parsed JSON response body
+    
+    Returns:
+        str: The summary, or None if the response holds none (e.g. an error)
+    """
+    # Fast path: the Router shape {"outputs": [{"summary_text": ...}]}
+    try:
+        summary = data["outputs"][0]["summary_text"]
+        if summary and isinstance(summary, str):
+            return summary
+    except (KeyError, TypeError, IndexError):
+        pass
+    
+    if isinstance(data, str):
+        return data
+    if isinstance(data, dict):
+        if "error" in data:
+            return None
+        if "outputs" in data:
+            data = data["outputs"]
+        else:
+            return data.get("summary_text") or data.get("generated_text")
+    obj = _first_output(data)
+    if isinstance(obj, dict):
+        return obj.get("summary_text") or obj.get("generated_text")
+    if isinstance(obj, str):
+        return obj
+    return None
+
+
+def _extract_sentiment_scores(data) -> Optional[list]:
+    """
+    Extract the label/score list from a HuggingFace sentiment response.
+    
+    Handles the Router format ({"outputs": [[{...}]]}) and the old list
+    formats ([[{...}]] or [{...}]).
+    
+    Args:
+        data: Parsed JSON response body
+    
+    Returns:
+        list: Dicts with 'label' and 'score' keys, or None if there are none
+    """
+    # Fast path: the Router shape {"outputs": [[{...}]]}
+    try:
+        scores = data["outputs"][0]
+        if isinstance(scores, list) and scores:
+            return scores
+    except (KeyError, TypeError, IndexError):
+        pass
+    
+    if isinstance(data, dict):
+        scores = _first_output(data.get("outputs"))
+    elif isinstance(data, list) and data:
+        # Could be [[{...}]] or [{...}]
+        scores = data[0] if isinstance(data[0], list) else data
+    else:
+        scores = None
+    if isinstance(scores, list) and scores:
+        return scores
+    return None
+
+
+def _try_parse_summary(response: httpx.Response, model: str) -> Optional[str]:
+    """
+    Parse a summary from a HuggingFace summarization response (200 or 410).
+    
+    Args:
+        response: The model's HTTP response
+        model: Model name (for logging)
+    
+    Returns:
+        str: The summary, or None if the body holds none
+    """
+    data = _json(response)
+    logger.debug("HuggingFace summary response (%s, %s): %.300s", model, response.status_code, data)
+    
+    summary = _extract_summary(data)
+    if not summary and isinstance(data, dict) and "error" in data:
+        error_msg = data.get("error", "Unknown error")
+        estimated_time = data.get("estimated_time", 0)
+        logger.debug("HuggingFace summary error (%s): %s (estimated time: %ss)", model, error_msg, estimated_time)
+    return summary
+
+
+def _try_parse_sentiment(response: httpx.Response, model: str) -> Optional[SentimentType]:
+    """
+    Parse a sentiment from a HuggingFace sentiment response (200 or 410).
+    
+    Args:
+        response: The model's HTTP response
+        model: Model name (for logging)
+    
+    Returns:
+        SentimentType: Positive or Negative, or None if the body holds no
+        conclusive label (so the next model is tried)
+    """
+    data = _json(response)
+    logger.debug("HuggingFace sentiment response (%s, %s): %.300s", model, response.status_code, data)
+    
+    scores_list = _extract_sentiment_scores(data)
+    if not scores_list:
+        if isinstance(data, dict) and "error" in data:
+            logger.debug("HuggingFace sentiment error (%s): %s", model, data.get("error", ""))
+        return None
+    
+    return _sentiment_from_scores(scores_list)
+
+
+def _sentiment_from_scores(scores_list: list) -> Optional[SentimentType]:
+    """
+    Map the highest-scoring HuggingFace label to a sentiment.
+    
+    Returns:
+        SentimentType: Positive or Negative, or None for a neutral/unknown label
+    """
+    # Find label with highest score
+    max_label = max(scores_list, key=lambda x: x.get("score", 0))
+    label = max_label.get("label", "")
+    score = max_label.get("score", 0)
+    
+    logger.debug("Detected sentiment label: %s (confidence: %.2f)", label, score)
+    
+    return _label_to_sentiment(label)
+
+
+# Known HuggingFace labels (None: neutral, try the next model)
+_LABEL_MAP: Dict[str, Optional[SentimentType]] = {
+    "POSITIVE": _POS, "POS": _POS, "LABEL_2": _POS, "LABEL_1": _POS,
+    "NEGATIVE": _NEG, "NEG": _NEG, "LABEL_0": _NEG,
+    "NEUTRAL": None, "NEU": None,
+}
+# Substring fallback for other labels, positive markers first
+_LABEL_MARKERS = (
+    ("POS", _POS), ("LABEL_2", _POS), ("LABEL_1", _POS),
+    ("NEG", _NEG), ("LABEL_0", _NEG),
+)
+
+
+def _label_to_sentiment(label: str) -> Optional[SentimentType]:
+    """
+    Map a HuggingFace label to our enum.
+    
+    Known labels are a single dict lookup; anything else falls back to
+    matching label markers inside it.
+    
+    Returns:
+        SentimentType: Positive or Negative, or None for a neutral/unknown label
+    """
+    label_upper = label.upper()
+    if label_upper in _LABEL_MAP:
+        return _LABEL_MAP[label_upper]
+    for marker, sentiment in _LABEL_MARKERS:
+        if marker in label_upper:
+            return sentiment
+    return None
+
+
+async def _hf_summary(client: httpx.AsyncClient, payload: bytes, headers: Dict[str, str]) -> Optional[str]:
+    """
+    Get a summary from the HuggingFace summarization models.
+    
+    Tries each model in order until one returns a summary.
+    
+    Args:
+        client: HTTP client to send requests with
+        payload: JSON request body with the (truncated) text to summarize
+        headers: Request headers (API key, JSON content type)
+    
+    Returns:
+        str: The summary, or None if no model produced one
+    """
+    summary = None
+    
+    # Try each model until one works
+    for model in HF_SUMMARY_MODELS:
+        if not _model_available(model):
+            logger.debug("Skipping HuggingFace summary model in cool-down: %s", model)
+            continue
+        try:
+            logger.debug("Calling HuggingFace summary API: %s", model)
+            # Router API format: https://router.huggingface.co/models/{model_name}
+            summary_response = await client.post(
+                f"{HUGGINGFACE_API_BASE}/models/{model}",
+                content=payload,
+                headers=headers,
+                timeout=HUGGINGFACE_TIMEOUT
+            )
+            
+            logger.debug("HuggingFace summary API status (%s): %s", model, summary_response.status_code)
+            
+            if summary_response.status_code in (200, 410):
+                # 410 is a deprecation warning, but the body may still hold a result
+                try:
+                    summary = _try_parse_summary(summary_response, model)
+                    if summary:
+                        logger.debug("Got summary from %s: %.100s...", model, summary)
+                        break  # Success, stop trying other models
+                except Exception as e:
+                    logger.warning("Error parsing HuggingFace summary response (%s): %s", model, e)
                 continue  # Try next model
-        
-        # Get sentiment using sentiment analysis model
-        # Try multiple reliable sentiment models
-        sentiment_models = [
-            "cardiffnlp/twitter-roberta-base-sentiment-latest",  # Best for social media text
-            "distilbert-base-uncased-finetuned-sst-2-english",  # Reliable alternative
-        ]
-        
-        sentiment = SentimentType.NEUTRAL
-        sentiment_payload = {"inputs": text[:512]}
-        
-        # Try each model until one works
-        for model in sentiment_models:
-            try:
-                print(f"Calling HuggingFace sentiment API: {model}")
-                # Router API format: https://router.huggingface.co/models/{model_name}
-                sentiment_response = await client.post(
-                    f"{HUGGINGFACE_API_BASE}/models/{model}",
-                    json=sentiment_payload,
-                    headers=headers
-                )
-                
-                print(f"HuggingFace sentiment API status ({model}): {sentiment_response.status_code}")
-                
-                if sentiment_response.status_code == 200:
-                    try:
-                        sentiment_data = sentiment_response.json()
-                        print(f"HuggingFace sentiment response preview: {str(sentiment_data)[:300]}")
-                        
-                        # Handle new Router format: {"outputs": [[{...}]]}
-                        scores_list = None
-                        
-                        if isinstance(sentiment_data, dict):
-                            # New Router Format: {"outputs": [[{...}]]}
-                            if "outputs" in sentiment_data:
-                                outputs = sentiment_data["outputs"]
-                                if isinstance(outputs, list) and len(outputs) > 0:
-                                    scores_list = outputs[0]  # First element is the scores list
-                        # Old list format: [[{...}]] or [{...}]
-                        elif isinstance(sentiment_data, list):
-                            if len(sentiment_data) > 0:
-                                # Could be [[{...}]] or [{...}]
-                                if isinstance(sentiment_data[0], list):
-                                    scores_list = sentiment_data[0]
-                                else:
-                                    scores_list = sentiment_data
-                        
-                        # Extract sentiment from scores
-                        if scores_list and isinstance(scores_list, list) and len(scores_list) > 0:
-                            # Find label with highest score
-                            max_label = max(scores_list, key=lambda x: x.get("score", 0))
-                            label = max_label.get("label", "")
-                            score = max_label.get("score", 0)
-                            
-                            print(f"Detected sentiment label: {label} (confidence: {score:.2f})")
-                            
-                            # Map HuggingFace labels to our enum
-                            label_upper = label.upper()
-                            if "POSITIVE" in label_upper or "POS" in label_upper or "LABEL_2" in label_upper or "LABEL_1" in label_upper:
-                                sentiment = SentimentType.POSITIVE
-                                print(f"✅ Sentiment detected: Positive")
-                                break  # Success, stop trying other models
-                            elif "NEGATIVE" in label_upper or "NEG" in label_upper or "LABEL_0" in label_upper:
-                                sentiment = SentimentType.NEGATIVE
-                                print(f"✅ Sentiment detected: Negative")
-                                break  # Success, stop trying other models
-                            else:
-                                sentiment = SentimentType.NEUTRAL
-                                # Continue to try next model if this one gave neutral
-                    except Exception as e:
-                        print(f"Error parsing HuggingFace sentiment response ({model}): {e}")
-                        continue  # Try next model
-                elif sentiment_response.status_code == 503:
-                    print(f"HuggingFace sentiment model loading ({model}, 503)...")
-                    continue  # Try next model
-                elif sentiment_response.status_code == 404:
-                    print(f"Model {model} not found (404), trying next model...")
-                    continue  # Try next model
-                elif sentiment_response.status_code == 410:
-                    # Deprecated endpoint warning - check if response body has data anyway
-                    try:
-                        response_text = sentiment_response.text
-                        print(f"HuggingFace API deprecated warning ({model}): 410")
-                        print(f"Response body preview: {response_text[:300]}")
-                        
-                        # Try to parse response body
-                        try:
-                            sentiment_data = sentiment_response.json()
-                            # Check if it's an error message
-                            if isinstance(sentiment_data, dict) and "error" in sentiment_data:
-                                error_msg = sentiment_data.get("error", "")
-                                print(f"Error message: {error_msg}")
-                            else:
-                                # Try to extract sentiment from response
-                                scores_list = None
-                                if isinstance(sentiment_data, dict):
-                                    if "outputs" in sentiment_data:
-                                        outputs = sentiment_data["outputs"]
-                                        if isinstance(outputs, list) and len(outputs) > 0:
-                                            scores_list = outputs[0]
-                                elif isinstance(sentiment_data, list):
-                                    if len(sentiment_data) > 0:
-                                        if isinstance(sentiment_data[0], list):
-                                            scores_list = sentiment_data[0]
-                                        else:
-                                            scores_list = sentiment_data
-                                
-                                if scores_list and isinstance(scores_list, list) and len(scores_list) > 0:
-                                    max_label = max(scores_list, key=lambda x: x.get("score", 0))
-                                    label = max_label.get("label", "").upper()
-                                    score = max_label.get("score", 0)
-                                    
-                                    print(f"Detected sentiment label: {label} (confidence: {score:.2f})")
-                                    
-                                    if "POSITIVE" in label or "POS" in label or "LABEL_2" in label or "LABEL_1" in label:
-                                        sentiment = SentimentType.POSITIVE
-                                        print(f"✅ Sentiment detected: Positive")
-                                        break
-                                    elif "NEGATIVE" in label or "NEG" in label or "LABEL_0" in label:
-                                        sentiment = SentimentType.NEGATIVE
-                                        print(f"✅ Sentiment detected: Negative")
-                                        break
-                        except Exception as parse_error:
-                            print(f"Could not parse 410 response: {parse_error}")
-                    except Exception as e:
-                        print(f"Error handling 410 response: {e}")
-                    continue  # Try next model
-                else:
-                    try:
-                        error_data = sentiment_response.json()
-                        print(f"HuggingFace sentiment API error ({model}, {sentiment_response.status_code}): {error_data}")
-                    except:
-                        print(f"HuggingFace sentiment API error ({model}, {sentiment_response.status_code})")
-                    continue  # Try next model
-            except Exception as e:
-                print(f"Exception calling sentiment model {model}: {e}")
+            elif summary_response.status_code == 503:
+                # Model is loading - skip it until it has had time to start, try next model
+                try:
+                    error_data = _json(summary_response)
+                    error_msg = error_data.get("error", "Model unavailable")
+                    estimated_time = error_data.get("estimated_time", 0)
+                    logger.debug("HuggingFace model loading (%s, 503): %s (estimated time: %ss)", model, error_msg, estimated_time)
+                except Exception:
+                    estimated_time = 0
+                    logger.debug("HuggingFace model loading (%s, 503): Model is starting up...", model)
+                _cool_down_model(model, estimated_time)
                 continue  # Try next model
-        
-        # Fallback: Generate simple summary if AI failed
-        if not summary:
-            summary = _generate_fallback_summary(text)
-            print(f"Using fallback summary generation")
-            print(f"Generated fallback summary: {summary[:100] if summary else 'None'}...")
-        
-        # Ensure summary is not None or empty
-        if not summary:
-            summary = "Summary not available"
-            print("Warning: Fallback summary generation returned empty, using default")
-        
-        # Fallback: Use keyword-based sentiment if AI failed
-        if sentiment == SentimentType.NEUTRAL and summary != "Summary not available":
-            sentiment = _detect_sentiment_keywords(text)
-            print(f"Using keyword-based sentiment: {sentiment.value}")
-        
-        print(f"Final result - Summary: {summary[:50] if summary else 'None'}..., Sentiment: {sentiment}")
-        
-        return {
-            "summary": summary,
-            "sentiment": sentiment
-        }
+            elif summary_response.status_code == 404:
+                logger.debug("Model %s not found (404), trying next model...", model)
+                continue  # Try next model
+            else:
+                # Other error status
+                try:
+                    error_data = _json(summary_response)
+                    logger.debug("HuggingFace summary API error (%s, %s): %s", model, summary_response.status_code, error_data)
+                except Exception:
+                    logger.debug("HuggingFace summary API error (%s, %s)", model, summary_response.status_code)
+                continue  # Try next model
+        except Exception as e:
+            logger.warning("Exception calling %s: %s", model, e)
+            _cool_down_model(model)
+            continue  # Try next model
+    
+    return summary
+
+
+async def _hf_sentiment(client: httpx.AsyncClient, payload: bytes, headers: Dict[str, str]) -> SentimentType:
+    """
+    Get sentiment from the HuggingFace sentiment analysis models.
+    
+    Tries each model in order until one returns a Positive or Negative label.
+    
+    Args:
+        client: HTTP client to send requests with
+        payload: JSON request body with the (truncated) text to analyze
+        headers: Request headers (API key, JSON content type)
+    
+    Returns:
+        SentimentType: Detected sentiment (Neutral if no model was conclusive)
+    """
+    sentiment = _NEU
+    
+    # Try each model until one works
+    for model in HF_SENTIMENT_MODELS:
+        if not _model_available(model):
+            logger.debug("Skipping HuggingFace sentiment model in cool-down: %s", model)
+            continue
+        try:
+            logger.debug("Calling HuggingFace sentiment API: %s", model)
+            # Router API format: https://router.huggingface.co/models/{model_name}
+            sentiment_response = await client.post(
+                f"{HUGGINGFACE_API_BASE}/models/{model}",
+                content=payload,
+                headers=headers,
+                timeout=HUGGINGFACE_TIMEOUT
+            )
+            
+            logger.debug("HuggingFace sentiment API status (%s): %s", model, sentiment_response.status_code)
+            
+            if sentiment_response.status_code in (200, 410):
+                # 410 is a deprecation warning, but the body may still hold a result
+                try:
+                    detected = _try_parse_sentiment(sentiment_response, model)
+                    if detected is not None:
+                        sentiment = detected
+                        logger.debug("Sentiment detected: %s", sentiment.value)
+                        break  # Success, stop trying other models
+                    # Continue to try next model if this one gave neutral
+                except Exception as e:
+                    logger.warning("Error parsing HuggingFace sentiment response (%s): %s", model, e)
+                continue  # Try next model
+            elif sentiment_response.status_code == 503:
+                # Model is loading - skip it until it has had time to start, try next model
+                try:
+                    estimated_time = _json(sentiment_response).get("estimated_time", 0)
+                except Exception:
+                    estimated_time = 0
+                logger.debug("HuggingFace sentiment model loading (%s, 503)...", model)
+                _cool_down_model(model, estimated_time)
+                continue  # Try next model
+            elif sentiment_response.status_code == 404:
+                logger.debug("Model %s not found (404), trying next model...", model)
+                continue  # Try next model
+            else:
+                try:
+                    error_data = _json(sentiment_response)
+                    logger.debug("HuggingFace sentiment API error (%s, %s): %s", model, sentiment_response.status_code, error_data)
+                except Exception:
+                    logger.debug("HuggingFace sentiment API error (%s, %s)", model, sentiment_response.status_code)
+                continue  # Try next model
+        except Exception as e:
+            logger.warning("Exception calling sentiment model %s: %s", model, e)
+            _cool_down_model(model)
+            continue  # Try next model
+    
+    return sentiment
+
+
+def _first_sentence_end(text: str) -> int:
+    """
+    Return the index of the first sentence terminator (., ! or ?), or -1.
+    
+    Each str.find stops at its first hit, so only the first sentence is
+    scanned instead of splitting the whole text.
+    """
+    best = -1
+    for ch in ".!?":
+        i = text.find(ch, 0, best if best >= 0 else len(text))
+        if i >= 0:
+            best = i
+    return best
 
 
 def _generate_fallback_summary(text: str) -> str:
@@ -442,76 +833,130 @@ def _generate_fallback_summary(text: str) -> str:
     text = text.strip()
     
     # Take first sentence if it's substantial (at least 15 chars)
-    sentences = re.split(r'[.!?]+', text)
-    if len(sentences) > 0:
-        first_sentence = sentences[0].strip()
-        if len(first_sentence) > 15:
-            # Add punctuation if missing
-            if not first_sentence.endswith(('.', '!', '?')):
-                first_sentence += "."
-            print(f"Fallback: Using first sentence: {first_sentence[:50]}...")
-            return first_sentence
-    
-    # Otherwise take first 30 words
-    words = text.split()[:30]
-    summary = " ".join(words)
-    if len(text.split()) > 30:
+    end = _first_sentence_end(text)
+    first_sentence = (text[:end] if end >= 0 else text).strip()
+    if len(first_sentence) > 15:
+        # Add punctuation if missing
+        if not first_sentence.endswith(('.', '!', '?')):
+            first_sentence += "."
+        logger.debug("Fallback: Using first sentence: %.50s...", first_sentence)
+        return first_sentence
+    
+    # Otherwise take first 30 words (split stops after the 31st word)
+    words = text.split(maxsplit=30)
+    summary = " ".join(words[:30])
+    if len(words) > 30:
         summary += "..."
     
-    print(f"Fallback: Using first 30 words: {summary[:50]}...")
+    logger.debug("Fallback: Using first 30 words: %.50s...", summary)
     return summary
 
 
-def _detect_sentiment_keywords(text: str) -> SentimentType:
+# Keyword lists for fallback sentiment detection
+POSITIVE_WORDS = (
+    "love", "loved", "loving", "amazing", "amazed", "great", "excellent",
+    "wonderful", "fantastic", "perfect", "best", "awesome", "outstanding",
+    "good", "happy", "pleased", "delighted", "satisfied", "brilliant",
+    "superb", "marvelous", "incredible", "beautiful", "gorgeous", "stunning",
+    "fabulous", "terrific", "magnificent", "exceptional", "remarkable",
+    "impressive", "delicious", "tasty", "yummy", "enjoy", "enjoyed", "enjoying"
+)
+
+NEGATIVE_WORDS = (
+    "hate", "hated", "hating", "terrible", "awful", "bad", "worst",
+    "disappointed", "horrible", "poor", "disgusting", "sad", "angry",
+    "frustrated", "annoyed", "upset", "disgusted", "dreadful", "pathetic",
+    "useless", "worthless", "garbage", "trash", "nasty",
+    "unhappy", "miserable", "depressed", "furious", "rage", "annoying"
+)
+
+
+def _compile_keyword_pattern(words) -> "re.Pattern[str]":
+    """Compile a word list into one whole-word alternation pattern."""
+    return re.compile(r'\b(?:' + '|'.join(map(re.escape, words)) + r')\b')
+
+
+# Compiled once at import: one scan over the text for both lists, each
+# match is then classified with a set lookup
+_KEYWORD_RE = _compile_keyword_pattern(POSITIVE_WORDS + NEGATIVE_WORDS)
+_POSITIVE_SET = frozenset(POSITIVE_WORDS)
+
+
+def _build_keyword_automaton():
     """
-    Simple keyword-based sentiment detection as fallback.
-    Uses word boundary matching to avoid false positives.
+    Build an Aho-Corasick automaton over both keyword lists.
+    
+    Each keyword maps to (sign, length): +1 for positive, -1 for negative.
+    """
+    automaton = ahocorasick.Automaton()
+    for word in POSITIVE_WORDS:
+        automaton.add_word(word, (1, len(word)))
+    for word in NEGATIVE_WORDS:
+        automaton.add_word(word, (-1, len(word)))
+    automaton.make_automaton()
+    return automaton
+
+
+# Single-pass scanner for both lists when pyahocorasick is installed
+_KEYWORD_AUTOMATON = _build_keyword_automaton() if ahocorasick is not None else None
+
+
+def _is_word_char(ch: str) -> bool:
+    """Match the regex word-character class (letters, digits, underscore)."""
+    return ch.isalnum() or ch == "_"
+
+
+def _count_keywords(text_lower: str) -> Tuple[int, int]:
+    """
+    Count whole-word positive and negative keyword matches.
+    
+    Uses the Aho-Corasick automaton (one pass over the text for both lists)
+    when available, otherwise the precompiled regex (also a single pass).
+    
+    Returns:
+        tuple: (positive_count, negative_count)
     """
-    text_lower = text.lower()
-    
-    # Expanded positive keywords
-    positive_words = [
-        "love", "loved", "loving", "amazing", "amazed", "great", "excellent", 
-        "wonderful", "fantastic", "perfect", "best", "awesome", "outstanding", 
-        "good", "happy", "pleased", "delighted", "satisfied", "brilliant", 
-        "superb", "marvelous", "incredible", "beautiful", "gorgeous", "stunning",
-        "fabulous", "terrific", "magnificent", "exceptional", "remarkable",
-        "impressive", "delicious", "tasty", "yummy", "enjoy", "enjoyed", "enjoying"
-    ]
-    
-    # Expanded negative keywords
-    negative_words = [
-        "hate", "hated", "hating", "terrible", "awful", "bad", "worst", 
-        "disappointed", "horrible", "poor", "disgusting", "sad", "angry", 
-        "frustrated", "annoyed", "upset", "disgusted", "dreadful", "pathetic",
-        "useless", "worthless", "garbage", "trash", "disgusting", "nasty",
-        "unhappy", "miserable", "depressed", "furious", "rage", "annoying"
-    ]
-    
-    # Count matches using word boundaries (more accurate)
-    import re
+    if _KEYWORD_AUTOMATON is None:
+        matches = _KEYWORD_RE.findall(text_lower)
+        positive_count = sum(map(_POSITIVE_SET.__contains__, matches))
+        return positive_count, len(matches) - positive_count
+    
     positive_count = 0
     negative_count = 0
+    last = len(text_lower) - 1
     
-    for word in positive_words:
-        # Use word boundary to match whole words only
-        pattern = r'\b' + re.escape(word) + r'\b'
-        matches = len(re.findall(pattern, text_lower))
-        positive_count += matches
+    for end, (sign, length) in _KEYWORD_AUTOMATON.iter(text_lower):
+        # Whole words only: neighbours must not be word characters
+        start = end - length + 1
+        if start > 0 and _is_word_char(text_lower[start - 1]):
+            continue
+        if end < last and _is_word_char(text_lower[end + 1]):
+            continue
+        
+        if sign > 0:
+            positive_count += 1
+        else:
+            negative_count += 1
     
-    for word in negative_words:
-        pattern = r'\b' + re.escape(word) + r'\b'
-        matches = len(re.findall(pattern, text_lower))
-        negative_count += matches
+    return positive_count, negative_count
+
+
+def _detect_sentiment_keywords(text: str) -> SentimentType:
+    """
+    Simple keyword-based sentiment detection as fallback.
+    Uses word boundary matching to avoid false positives.
+    """
+    # Count whole-word matches
+    positive_count, negative_count = _count_keywords(text.lower())
     
-    print(f"Keyword sentiment detection: {positive_count} positive, {negative_count} negative")
+    logger.debug("Keyword sentiment detection: %d positive, %d negative", positive_count, negative_count)
     
     if positive_count > negative_count:
-        return SentimentType.POSITIVE
+        return _POS
     elif negative_count > positive_count:
-        return SentimentType.NEGATIVE
+        return _NEG
     else:
-        return SentimentType.NEUTRAL
+        return _NEU
 
 
 async def analyze_text(text: str) -> Dict[str, Optional[str]]:
@@ -521,6 +966,47 @@ async def analyze_text(text: str) -> Dict[str, Optional[str]]:
     Uses HuggingFace API as primary service.
     Falls back to OpenAI if HuggingFace fails.
     
+    Concurrent calls with the same text are coalesced: only the first one
+    runs the analysis, the others wait for and share its result.
+    
+    Args:
+        text: The text content to analyze
+    
+    Returns:
+        dict: Contains 'summary' and 'sentiment' keys
+    
+    Raises:
+        Exception: If all AI services fail
+    """
+    key = _text_fingerprint(text)
+    
+    # Same text already being analyzed: wait for that result
+    # (shield so one cancelled waiter doesn't cancel the shared analysis)
+    inflight = _inflight.get(key)
+    if inflight is not None:
+        return dict(await asyncio.shield(inflight))
+    
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        result = await _analyze_text_uncoalesced(text)
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # Mark retrieved, there may be no other waiters
+        raise
+    else:
+        future.set_result(result)
+        return dict(result)
+    finally:
+        del _inflight[key]
+        if not future.done():
+            future.cancel()  # Analysis was cancelled, release waiters
+
+
+async def _analyze_text_uncoalesced(text: str) -> Dict[str, Optional[str]]:
+    """
+    Run the analysis for one text (HuggingFace first, then OpenAI).
+    
     Args:
         text: The text content to analyze
     
@@ -539,29 +1025,29 @@ async def analyze_text(text: str) -> Dict[str, Optional[str]]:
     # Try HuggingFace first (FREE tier)
     if huggingface_configured:
         try:
-            print(f"Attempting HuggingFace API analysis...")
+            logger.debug("Attempting HuggingFace API analysis...")
             result = await analyze_with_huggingface(text)
             summary = result.get("summary", "")
             if summary and summary != "Summary not available":
                 is_fallback = (
                     len(summary.split()) <= 30 or
                     summary.endswith("...") or
-                    summary == text[:len(summary)]
+                    text.startswith(summary)
                 )
                 if not is_fallback:
-                    print(f"✅ HuggingFace API succeeded")
+                    logger.info("HuggingFace API succeeded")
                     return result
                 else:
-                    print(f"⚠️ HuggingFace API unavailable - using fallback")
+                    logger.info("HuggingFace API unavailable - using fallback")
                     return result
             else:
-                print(f"⚠️ HuggingFace API unavailable - using fallback")
+                logger.info("HuggingFace API unavailable - using fallback")
                 return result
         except ValueError as e:
             # API key not configured error
-            print(f"HuggingFace API key error: {e}")
+            logger.warning("HuggingFace API key error: %s", e)
         except Exception as e:
-            print(f"HuggingFace API failed: {e}")
+            logger.warning("HuggingFace API failed: %s", e)
             # Continue to fallback if available
     
     # Fallback to OpenAI (optional, requires paid account)
@@ -573,20 +1059,20 @@ async def analyze_text(text: str) -> Dict[str, Optional[str]]:
     
     if openai_configured:
         try:
-            print(f"Attempting OpenAI API fallback...")
+            logger.debug("Attempting OpenAI API fallback...")
             return await analyze_with_openai(text)
         except Exception as e:
-            print(f"OpenAI API failed: {e}")
+            logger.warning("OpenAI API failed: %s", e)
     
     if not huggingface_configured and not openai_configured:
         error_msg = (
             "No API keys configured. "
             "Please set HUGGINGFACE_API_KEY in .env file."
         )
-        print(error_msg)
+        logger.error(error_msg)
         raise ValueError(error_msg)
     else:
         error_msg = "All services unavailable. Check your API keys and network connection."
-        print(error_msg)
+        logger.error(error_msg)
         raise Exception(error_msg)
 
@@ -0,0 +1,21 @@
+-- Convert contents.sentiment from the old ENUM('POSITIVE','NEGATIVE','NEUTRAL')
+-- column to the 1-byte integer code used by app.models.SentimentCode.
+--
+-- Codes: 0 = Negative, 1 = Neutral, 2 = Positive. NULL (not yet analyzed) stays NULL.
+-- Base.metadata.create_all does not alter existing tables, so run this once
+-- against databases created before the change:
+--
+--   mysql -u root emo_energy < migrations/001_sentiment_code.sql
+
+ALTER TABLE contents ADD COLUMN sentiment_code TINYINT NULL;
+
+UPDATE contents
+SET sentiment_code = CASE sentiment
+    WHEN 'NEGATIVE' THEN 0
+    WHEN 'NEUTRAL' THEN 1
+    WHEN 'POSITIVE' THEN 2
+    ELSE NULL
+END;
+
+ALTER TABLE contents DROP COLUMN sentiment;
+ALTER TABLE contents CHANGE COLUMN sentiment_code sentiment TINYINT NULL;
@@ -0,0 +1,251 @@
+"""
+Text analysis service tests.
+
+Tests:
+- HuggingFace result cache (hit, LRU eviction, expiry)
+- Coalescing of concurrent identical analyses
+- Cool-down of loading HuggingFace models
+- Batching of concurrent HuggingFace requests
+- HuggingFace and OpenAI response handling and parsing
+- Keyword sentiment and summary fallbacks
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.services import ai_service
+from app.models import SentimentType
+
+
+def test_hf_cache_hit_and_eviction(monkeypatch):
+    """Test cached results are returned and the least recently used entry is evicted."""
+    monkeypatch.setattr(ai_service, "_hf_cache", ai_service.OrderedDict())
+    monkeypatch.setattr(ai_service, "HF_CACHE_MAX", 2)
+    result = {"summary": "Short summary", "sentiment": SentimentType.POSITIVE}
+    
+    ai_service._hf_cache_put("a", result)
+    ai_service._hf_cache_put("b", result)
+    assert ai_service._hf_cache_get("a") == result  # "a" is now most recently used
+    
+    ai_service._hf_cache_put("c", result)
+    assert ai_service._hf_cache_get("b") is None
+    assert ai_service._hf_cache_get("a") == result
+    assert ai_service._hf_cache_get("c") == result
+
+
+def test_hf_cache_expiry(monkeypatch):
+    """Test cached results expire after the TTL."""
+    monkeypatch.setattr(ai_service, "_hf_cache", ai_service.OrderedDict())
+    monkeypatch.setattr(ai_service, "HF_CACHE_TTL", 0)
+    
+    ai_service._hf_cache_put("a", {"summary": "s", "sentiment": SentimentType.NEUTRAL})
+    monkeypatch.setattr(ai_service.time, "monotonic", lambda: float("inf"))
+    assert ai_service._hf_cache_get("a") is None
+
+
+def test_analyze_text_coalesces_concurrent_calls(monkeypatch):
+    """Test concurrent analyses of the same text share a single service call."""
+    calls = []
+    
+    async def fake_analyze(text):
+        calls.append(text)
+        await asyncio.sleep(0.01)
+        return {"summary": "Shared summary", "sentiment": SentimentType.NEUTRAL}
+    
+    monkeypatch.setattr(ai_service, "_analyze_text_uncoalesced", fake_analyze)
+    
+    async def run():
+        return await asyncio.gather(*(ai_service.analyze_text("same text") for _ in range(5)))
+    
+    results = asyncio.run(run())
+    
+    assert len(calls) == 1
+    assert all(r["summary"] == "Shared summary" for r in results)
+    assert ai_service._inflight == {}
+
+
+def test_analyze_with_huggingface_parses_both_models(monkeypatch):
+    """Test summary and sentiment are requested and parsed from the HuggingFace responses."""
+    requested = []
+    
+    def handler(request):
+        requested.append(request.url.path)
+        assert request.headers["content-type"] == "application/json"
+        assert json.loads(request.content) == {"inputs": "Some text to analyze for the test."}
+        if "bart" in request.url.path:
+            return httpx.Response(200, json=[{"summary_text": "A generated summary of the text."}])
+        return httpx.Response(200, json=[[{"label": "NEGATIVE", "score": 0.97}, {"label": "POSITIVE", "score": 0.03}]])
+    
+    monkeypatch.setattr(ai_service, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(ai_service, "HUGGINGFACE_API_KEY", "test-key")
+    monkeypatch.setattr(ai_service, "_hf_cache", ai_service.OrderedDict())
+    
+    result = asyncio.run(ai_service.analyze_with_huggingface("Some text to analyze for the test."))
+    
+    assert result == {"summary": "A generated summary of the text.", "sentiment": SentimentType.NEGATIVE}
+    assert len(requested) == 2
+
+
+def test_detect_sentiment_keywords():
+    """Test keyword sentiment counts whole words only."""
+    assert ai_service._detect_sentiment_keywords("I loved it, the food was great!") == SentimentType.POSITIVE
+    assert ai_service._detect_sentiment_keywords("Awful service and a terrible, BAD meal.") == SentimentType.NEGATIVE
+    assert ai_service._detect_sentiment_keywords("Good start, bad ending.") == SentimentType.NEUTRAL
+    # Substrings of keywords inside other words don't count ("badge", "goodbye")
+    assert ai_service._detect_sentiment_keywords("Show your badge and say goodbye.") == SentimentType.NEUTRAL
+
+
+def test_keyword_automaton_matches_regex_counts(monkeypatch):
+    """Test the Aho-Corasick keyword scan counts the same matches as the regex scan."""
+    pytest.importorskip("ahocorasick")
+    samples = [
+        "I loved it, the food was great!",
+        "Awful service and a terrible, BAD meal.".lower(),
+        "show your badge and say goodbye.",
+        "good_bad good-bad goodbad lovely love",
+        "",
+    ]
+    
+    automaton_counts = [ai_service._count_keywords(sample) for sample in samples]
+    monkeypatch.setattr(ai_service, "_KEYWORD_AUTOMATON", None)
+    regex_counts = [ai_service._count_keywords(sample) for sample in samples]
+    
+    assert automaton_counts == regex_counts
+    assert regex_counts[0] == (2, 0)
+    assert regex_counts[1] == (0, 3)
+
+
+def test_generate_fallback_summary():
+    """Test fallback summary uses the first sentence, or the first 30 words."""
+    assert ai_service._generate_fallback_summary(
+        "The weather was lovely today! We went to the park."
+    ) == "The weather was lovely today."
+    assert ai_service._generate_fallback_summary(
+        "This has no sentence terminator at all"
+    ) == "This has no sentence terminator at all."
+    
+    # Short first sentence: first 30 words instead
+    long_text = "Hi. " + " ".join(f"word{i}" for i in range(40))
+    assert ai_service._generate_fallback_summary(long_text) == (
+        "Hi. " + " ".join(f"word{i}" for i in range(29)) + "..."
+    )
+    assert ai_service._generate_fallback_summary("   ") == "No text provided"
+
+
+@pytest.mark.parametrize("data, expected", [
+    ({"outputs": [{"summary_text": "router"}]}, "router"),
+    ({"outputs": ["router string"]}, "router string"),
+    ({"generated_text": "direct"}, "direct"),
+    ([{"summary_text": "old list"}], "old list"),
+    ("plain string", "plain string"),
+    ({"error": "Model is loading", "estimated_time": 20}, None),
+    ([], None),
+])
+def test_extract_summary(data, expected):
+    """Test summary extraction from each HuggingFace response shape."""
+    assert ai_service._extract_summary(data) == expected
+
+
+def test_extract_sentiment_scores():
+    """Test score list extraction from each HuggingFace response shape."""
+    scores = [{"label": "POSITIVE", "score": 0.9}]
+    assert ai_service._extract_sentiment_scores({"outputs": [scores]}) == scores
+    assert ai_service._extract_sentiment_scores([scores]) == scores
+    assert ai_service._extract_sentiment_scores(scores) == scores
+    assert ai_service._extract_sentiment_scores({"error": "Model is loading"}) is None
+    assert ai_service._extract_sentiment_scores([]) is None
+
+
+@pytest.mark.parametrize("content", [
+    "Summary: The author enjoyed the trip.\n\nSentiment: Positive\n",
+    "Summary: The author enjoyed the trip.\nTone: upbeat\nSentiment: Positive\n",
+    "Sentiment: Positive\nSummary: The author enjoyed the trip.\n",
+])
+def test_analyze_with_openai_parses_response(monkeypatch, content):
+    """Test summary and sentiment are parsed from the OpenAI reply format."""
+    def handler(request):
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+    
+    monkeypatch.setattr(ai_service, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(ai_service, "OPENAI_API_KEY", "test-key")
+    
+    result = asyncio.run(ai_service.analyze_with_openai("Some text to analyze."))
+    
+    assert result == {"summary": "The author enjoyed the trip.", "sentiment": SentimentType.POSITIVE}
+
+
+def test_loading_model_is_skipped_during_cooldown(monkeypatch):
+    """Test a model that answered 503 is not called again until its cool-down expires."""
+    requested = []
+    
+    def handler(request):
+        requested.append(request.url.path)
+        if request.url.path.endswith("facebook/bart-large-cnn"):
+            return httpx.Response(503, json={"error": "Model is loading", "estimated_time": 20})
+        if "bart" in request.url.path:
+            return httpx.Response(200, json=[{"summary_text": "A generated summary of the text."}])
+        return httpx.Response(200, json=[[{"label": "POSITIVE", "score": 0.9}]])
+    
+    monkeypatch.setattr(ai_service, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(ai_service, "HUGGINGFACE_API_KEY", "test-key")
+    monkeypatch.setattr(ai_service, "_hf_cache", ai_service.OrderedDict())
+    ai_service.reset_cooldowns()
+    
+    try:
+        asyncio.run(ai_service.analyze_with_huggingface("First text to analyze for the test."))
+        asyncio.run(ai_service.analyze_with_huggingface("Second text to analyze for the test."))
+    finally:
+        ai_service.reset_cooldowns()
+    
+    assert sum(path.endswith("facebook/bart-large-cnn") for path in requested) == 1
+    assert sum(path.endswith("distilbart-cnn-12-6") for path in requested) == 2
+
+
+def test_concurrent_texts_are_batched(monkeypatch):
+    """Test texts arriving within the batch window share one request per model."""
+    requests = []
+    
+    def handler(request):
+        inputs = json.loads(request.content)["inputs"]
+        requests.append((request.url.path, inputs))
+        if "bart" in request.url.path:
+            return httpx.Response(200, json=[{"summary_text": f"Model summary of {t}"} for t in inputs])
+        return httpx.Response(200, json=[[{"label": "POSITIVE", "score": 0.9}] for _ in inputs])
+    
+    monkeypatch.setattr(ai_service, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(ai_service, "HUGGINGFACE_API_KEY", "test-key")
+    monkeypatch.setattr(ai_service, "_hf_cache", ai_service.OrderedDict())
+    monkeypatch.setattr(ai_service, "HF_BATCH_WINDOW", 0.01)
+    ai_service.reset_cooldowns()
+    
+    async def run():
+        return await asyncio.gather(
+            ai_service.analyze_with_huggingface("first text"),
+            ai_service.analyze_with_huggingface("second text"),
+        )
+    
+    first, second = asyncio.run(run())
+    
+    assert first == {"summary": "Model summary of first text", "sentiment": SentimentType.POSITIVE}
+    assert second == {"summary": "Model summary of second text", "sentiment": SentimentType.POSITIVE}
+    assert len(requests) == 2
+    assert all(inputs == ["first text", "second text"] for _, inputs in requests)
+
+
+@pytest.mark.parametrize("label, expected", [
+    ("POSITIVE", SentimentType.POSITIVE),
+    ("positive", SentimentType.POSITIVE),
+    ("LABEL_2", SentimentType.POSITIVE),
+    ("NEGATIVE", SentimentType.NEGATIVE),
+    ("LABEL_0", SentimentType.NEGATIVE),
+    ("neutral", None),
+    ("very_positive", SentimentType.POSITIVE),
+    ("mostly-negative", SentimentType.NEGATIVE),
+    ("mixed", None),
+])
+def test_label_to_sentiment(label, expected):
+    """Test HuggingFace labels map to sentiments (exact labels and substrings)."""
+    assert ai_service._label_to_sentiment(label) == expected
@@ -2,66 +2,77 @@
 Content management endpoint tests.
 
 Tests:
-- Create content (success and unauthorized)
-- Get all contents
-- Get content by ID
+- Create content (success, single statement and unauthorized)
+- Get all contents (with pagination)
+- Get content by ID (including stored sentiment)
 - Delete content
 """
 
+import pytest
 from fastapi import status
+from sqlalchemy import event, text
 
-
-def get_auth_token(client, username="testuser", password="testpassword123"):
-    """Helper: Get JWT token for authenticated requests."""
-    response = client.post(
-        "/api/login",
-        json={"username": username, "password": password}
-    )
-    return response.json()["access_token"]
+from app.models import Content, SentimentType
+from tests.conftest import engine, seed_contents
 
 
-def test_create_content_success(client, test_user):
+def test_create_content_success(client, auth_headers):
     """Test authenticated user can create content."""
-    token = get_auth_token(client)
-    headers = {"Authorization": f"Bearer {token}"}
-    
     response = client.post(
         "/api/contents",
         json={"text": "This is a test content for AI analysis."},
-        headers=headers
+        headers=auth_headers
     )
     
     assert response.status_code == status.HTTP_201_CREATED
     data = response.json()
     assert data["text"] == "This is a test content for AI analysis."
     assert data["id"] is not None
-    assert data["user_id"] == test_user.id
 
 
-def test_create_content_unauthorized(client):
+def test_create_content_single_statement(client, auth_headers):
+    """Test creating content issues one INSERT and no follow-up SELECT."""
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        # SAVEPOINT statements come from the test transaction (see db_session)
+        if "SAVEPOINT" not in statement:
+            statements.append(statement)
+    
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.post(
+            "/api/contents",
+            json={"text": "Single round-trip content"},
+            headers=auth_headers
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["created_at"] is not None
+    assert len(statements) == 1
+    assert statements[0].lstrip().upper().startswith("INSERT INTO CONTENTS")
+
+
+def test_create_content_unauthorized(raw_client):
     """Test unauthenticated requests are rejected."""
-    response = client.post(
+    response = raw_client.post(
         "/api/contents",
         json={"text": "Unauthorized content"}
     )
     
-    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    # HTTPBearer rejects a missing Authorization header with 403
+    assert response.status_code == status.HTTP_403_FORBIDDEN
 
 
-def test_get_contents_success(client, test_user):
+def test_get_contents_success(client, test_user, auth_headers, db_session):
     """Test user can retrieve their content list."""
-    token = get_auth_token(client)
-    headers = {"Authorization": f"Bearer {token}"}
-    
     # Create content
-    client.post(
-        "/api/contents",
-        json={"text": "First content"},
-        headers=headers
-    )
+    seed_contents(db_session, test_user, ["First content"])
     
     # Get all contents
-    response = client.get("/api/contents", headers=headers)
+    response = client.get("/api/contents", headers=auth_headers)
     
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
@@ -69,21 +80,37 @@ def test_get_contents_success(client, test_user):
     assert len(data["contents"]) >= 1
 
 
-def test_get_content_by_id(client, test_user):
-    """Test user can retrieve specific content by ID."""
-    token = get_auth_token(client)
-    headers = {"Authorization": f"Bearer {token}"}
+def test_get_contents_pagination(client, test_user, auth_headers, db_session):
+    """Test pagination returns newest content first with the full total."""
+    # Create three contents
+    seed_contents(db_session, test_user, ["First", "Second", "Third"])
+    
+    # First page
+    response = client.get("/api/contents?limit=2", headers=auth_headers)
+    data = response.json()
+    assert data["total"] == 3
+    assert [c["text"] for c in data["contents"]] == ["Third", "Second"]
+    
+    # Page past the end still reports the total
+    response = client.get("/api/contents?skip=5", headers=auth_headers)
+    data = response.json()
+    assert data["total"] == 3
+    assert data["contents"] == []
     
+    # So does an empty page from limit=0
+    response = client.get("/api/contents?limit=0", headers=auth_headers)
+    data = response.json()
+    assert data["total"] == 3
+    assert data["contents"] == []
+
+
+def test_get_content_by_id(client, test_user, auth_headers, db_session):
+    """Test user can retrieve specific content by ID."""
     # Create content
-    create_response = client.post(
-        "/api/contents",
-        json={"text": "Specific content"},
-        headers=headers
-    )
-    content_id = create_response.json()["id"]
+    content_id = seed_contents(db_session, test_user, ["Specific content"])[0].id
     
     # Get content by ID
-    response = client.get(f"/api/contents/{content_id}", headers=headers)
+    response = client.get(f"/api/contents/{content_id}", headers=auth_headers)
     
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
@@ -91,24 +118,60 @@ def test_get_content_by_id(client, test_user):
     assert data["text"] == "Specific content"
 
 
-def test_delete_content_success(client, test_user):
-    """Test user can delete their content."""
-    token = get_auth_token(client)
-    headers = {"Authorization": f"Bearer {token}"}
+def test_created_at_same_after_create_and_get(client, auth_headers):
+    """Test created_at returned by POST matches the value returned by GET."""
+    created = client.post("/api/contents", json={"text": "Timestamp check"}, headers=auth_headers).json()
     
-    # Create content
-    create_response = client.post(
-        "/api/contents",
-        json={"text": "Content to delete"},
-        headers=headers
+    response = client.get(f"/api/contents/{created['id']}", headers=auth_headers)
+    
+    assert response.json()["created_at"] == created["created_at"]
+
+
+def test_get_content_sentiment_round_trip(client, test_user, auth_headers, db_session):
+    """Test sentiment stored as an integer code is returned as its label."""
+    content = Content(user_id=test_user.id, text="Great stuff", sentiment=SentimentType.POSITIVE)
+    db_session.add(content)
+    db_session.commit()
+    
+    # Raw column holds the code, API returns the label
+    raw = db_session.execute(text("SELECT sentiment FROM contents WHERE id = :id"), {"id": content.id}).scalar()
+    assert raw == 2
+    
+    response = client.get(f"/api/contents/{content.id}", headers=auth_headers)
+    assert response.json()["sentiment"] == "Positive"
+
+
+@pytest.mark.skipif(engine.dialect.name == "mysql", reason="strict TINYINT column rejects text labels")
+def test_get_content_legacy_sentiment_label(client, test_user, auth_headers, db_session):
+    """Test a row still holding the old enum label is read as SentimentType."""
+    content = Content(user_id=test_user.id, text="Old row")
+    db_session.add(content)
+    db_session.commit()
+    
+    # Simulate a row written before the column was migrated
+    db_session.execute(
+        text("UPDATE contents SET sentiment = 'NEGATIVE' WHERE id = :id"),
+        {"id": content.id}
     )
-    content_id = create_response.json()["id"]
+    db_session.commit()
+    db_session.expire_all()
+    
+    assert db_session.get(Content, content.id).sentiment == SentimentType.NEGATIVE
+    
+    response = client.get(f"/api/contents/{content.id}", headers=auth_headers)
+    assert response.json()["sentiment"] == "Negative"
+
+
+def test_delete_content_success(client, test_user, auth_headers, db_session):
+    """Test user can delete their content."""
+    # Create content
+    content_id = seed_contents(db_session, test_user, ["Content to delete"])[0].id
     
     # Delete content
-    delete_response = client.delete(f"/api/contents/{content_id}", headers=headers)
+    delete_response = client.delete(f"/api/contents/{content_id}", headers=auth_headers)
     assert delete_response.status_code == status.HTTP_204_NO_CONTENT
     
     # Verify content is deleted
-    get_response = client.get(f"/api/contents/{content_id}", headers=headers)
+    get_response = client.get(f"/api/contents/{content_id}", headers=auth_headers)
     assert get_response.status_code == status.HTTP_404_NOT_FOUND
 